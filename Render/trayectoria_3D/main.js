@@ -6,47 +6,89 @@ const EARTH_DIAMETER = 12742000; // Diámetro de la Tierra en metros
 const SCALE_FACTOR = 0.0000002; // Factor de escala para las órbitas
 const EARTH_RADIUS_SCALED = (EARTH_DIAMETER/2) * SCALE_FACTOR; // Radio de la Tierra escalado
 
-// Función para cargar y procesar el CSV
+// Estado del nivel de detalle
+const orbitLines = {};
+let lodDistance = null;      // Distancia de cámara con la que se pidió el nivel actual
+let lodLevel = null;
+let lodLoading = false;
+
+// Ventana de tiempo opcional: trayectoria_3D/index.html?t0=0&t1=3600
+const params = new URLSearchParams(window.location.search);
+const timeWindow = {
+    t0: params.get('t0'),
+    t1: params.get('t1')
+};
+
+// Metros que ocupa un píxel a la distancia actual de la cámara
+function metersPerPixel() {
+    const distance = camera.position.length();
+    const visibleHeight = 2 * distance * Math.tan(THREE.MathUtils.degToRad(camera.fov / 2));
+    return visibleHeight / window.innerHeight / SCALE_FACTOR;
+}
+
+// Función para cargar el nivel de detalle que corresponde al zoom actual
 async function loadOrbitData() {
-    const response = await fetch('orbitas_3D.csv');
-    const data = await response.text();
-    const rows = data.split('\n');
-    const headers = rows[0].split(',');
-    
-    const orbitPoints = {
-        sat1: [],
-        sat2: [],
-        sat3: []
-    };
-    
-    // Empezar desde 1 para saltar los headers
-    for(let i = 1; i < rows.length; i++) {
-        if(rows[i].trim() === '') continue;
-        const values = rows[i].split(',');
-
-        // Puntos para el primer satélite
-        orbitPoints.sat1.push(new THREE.Vector3(
-            parseFloat(values[1]) * SCALE_FACTOR,
-            parseFloat(values[2]) * SCALE_FACTOR,
-            parseFloat(values[3]) * SCALE_FACTOR
-        ));
-
-        // Puntos para el segundo satélite
-        orbitPoints.sat2.push(new THREE.Vector3(
-            parseFloat(values[4]) * SCALE_FACTOR,
-            parseFloat(values[5]) * SCALE_FACTOR,
-            parseFloat(values[6]) * SCALE_FACTOR
-        ));
-
-        // Puntos para el tercer satélite
-        orbitPoints.sat3.push(new THREE.Vector3(
-            parseFloat(values[7]) * SCALE_FACTOR,
-            parseFloat(values[8]) * SCALE_FACTOR,
-            parseFloat(values[9]) * SCALE_FACTOR
-        ));
+    const query = new URLSearchParams({ tolerancia: metersPerPixel() });
+    if(timeWindow.t0 !== null) query.set('t0', timeWindow.t0);
+    if(timeWindow.t1 !== null) query.set('t1', timeWindow.t1);
+
+    // El servidor responde 503 mientras precalcula la pirámide
+    let response = await fetch(`/trayectorias?${query}`);
+    while(response.status === 503) {
+        const wait = parseInt(response.headers.get('Retry-After') || '5', 10);
+        await new Promise(resolve => setTimeout(resolve, wait * 1000));
+        response = await fetch(`/trayectorias?${query}`);
+    }
+    const data = await response.json();
+    if(!data.success) {
+        throw new Error(data.error);
+    }
+
+    const orbitPoints = {};
+    for(const [name, sat] of Object.entries(data.satelites)) {
+        const points = [];
+        for(let i = 0; i < sat.puntos.length; i += 3) {
+            points.push(new THREE.Vector3(
+                sat.puntos[i] * SCALE_FACTOR,
+                sat.puntos[i + 1] * SCALE_FACTOR,
+                sat.puntos[i + 2] * SCALE_FACTOR
+            ));
+        }
+        orbitPoints[name] = points;
+    }
+
+    return { level: data.nivel, orbitPoints };
+}
+
+// Color de cada satélite (los tres primeros como antes, el resto repartidos en el círculo cromático)
+function satelliteColor(index) {
+    const base = [0xff0000, 0x00ff00, 0x0000ff];
+    if(index < base.length) return base[index];
+    return new THREE.Color().setHSL((index * 0.618) % 1, 0.8, 0.5).getHex();
+}
+
+// Reemplaza las líneas de órbita si el zoom pide otro nivel
+async function updateOrbitLevel() {
+    lodLoading = true;
+    lodDistance = camera.position.length();
+    try {
+        const { level, orbitPoints } = await loadOrbitData();
+        if(level === lodLevel) return orbitPoints;
+        lodLevel = level;
+
+        Object.keys(orbitPoints).forEach((name, index) => {
+            if(orbitLines[name]) {
+                scene.remove(orbitLines[name]);
+                orbitLines[name].geometry.dispose();
+                orbitLines[name].material.dispose();
+            }
+            orbitLines[name] = createOrbitLine(orbitPoints[name], satelliteColor(index));
+            scene.add(orbitLines[name]);
+        });
+        return orbitPoints;
+    } finally {
+        lodLoading = false;
     }
-    
-    return orbitPoints;
 }
 
 // Función para crear la línea de la órbita
@@ -127,38 +169,15 @@ async function init() {
     directionalLight.position.set(5, 5, 5);
     scene.add(directionalLight);
 
-    // Cargar y agregar las órbitas
-    const orbitPoints = await loadOrbitData();
-    
-    // Colores para cada satélite
-    const colors = {
-        sat1: 0xff0000,  // Rojo
-        sat2: 0x00ff00,  // Verde
-        sat3: 0x0000ff   // Azul
-    };
-
-    // Crear y agregar las líneas de órbita
-    const orbitLine1 = createOrbitLine(orbitPoints.sat1, colors.sat1);
-    const orbitLine2 = createOrbitLine(orbitPoints.sat2, colors.sat2);
-    const orbitLine3 = createOrbitLine(orbitPoints.sat3, colors.sat3);
-    
-    scene.add(orbitLine1);
-    scene.add(orbitLine2);
-    scene.add(orbitLine3);
-
-    // Crear y agregar los satélites
-    const sat1 = createSatellite(colors.sat1);
-    const sat2 = createSatellite(colors.sat2);
-    const sat3 = createSatellite(colors.sat3);
+    // Cargar y agregar las órbitas (nivel de detalle según el zoom)
+    const orbitPoints = await updateOrbitLevel();
 
-    // Posicionar los satélites en el primer punto de sus órbitas respectivas
-    if(orbitPoints.sat1.length > 0) sat1.position.copy(orbitPoints.sat1[0]);
-    if(orbitPoints.sat2.length > 0) sat2.position.copy(orbitPoints.sat2[0]);
-    if(orbitPoints.sat3.length > 0) sat3.position.copy(orbitPoints.sat3[0]);
-
-    scene.add(sat1);
-    scene.add(sat2);
-    scene.add(sat3);
+    // Crear los satélites en el primer punto de sus órbitas respectivas
+    Object.keys(orbitPoints).forEach((name, index) => {
+        const sat = createSatellite(satelliteColor(index));
+        if(orbitPoints[name].length > 0) sat.position.copy(orbitPoints[name][0]);
+        scene.add(sat);
+    });
 
     // Agregar una grilla de ayuda
     const gridHelper = new THREE.GridHelper(EARTH_RADIUS_SCALED * 20, 20, 0x303030, 0x303030);
@@ -179,6 +198,13 @@ function onWindowResize() {
 function animate() {
     requestAnimationFrame(animate);
     controls.update();
+
+    // Pedir otro nivel cuando el zoom cambia más de un 25%
+    const distance = camera.position.length();
+    if(!lodLoading && lodDistance !== null && Math.abs(distance - lodDistance) / lodDistance > 0.25) {
+        updateOrbitLevel().catch(error => console.error('Error al cargar el nivel:', error));
+    }
+
     renderer.render(scene, camera);
 }
 
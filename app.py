@@ -3,10 +3,12 @@ import pandas as pd
 import numpy as np
 import os
 import sys
+import threading
 
 # Add the current directory to the Python path
 sys.path.append(os.path.dirname(__file__))
 from codigo_base.sim3D import calcular_posicion_3D
+from codigo_base.piramide import cargar_piramide
 
 app = Flask(__name__, 
            template_folder='Render',
@@ -22,6 +24,23 @@ except FileNotFoundError:
     print("Archivos en el directorio:", os.listdir())
     sys.exit(1)
 
+# Pirámide de niveles de detalle del visor de trayectorias: un único hilo la
+# precalcula al iniciar, y /trayectorias responde 503 hasta que esté lista
+RUTA_TRAYECTORIAS = os.path.join(os.path.dirname(__file__), 'Render', 'trayectoria_3D', 'orbitas_3D.csv')
+piramide = None
+error_piramide = None
+
+def construir_piramide():
+    global piramide, error_piramide
+    try:
+        piramide = cargar_piramide(RUTA_TRAYECTORIAS)
+        print("Pirámide de trayectorias lista")
+    except Exception as e:
+        error_piramide = str(e)
+        print(f"Error al construir la pirámide: {error_piramide}")
+
+threading.Thread(target=construir_piramide, daemon=True).start()
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -64,6 +83,37 @@ def calculate_position():
             'error': str(e)
         }), 500
 
+@app.route('/trayectorias')
+def trayectorias():
+    if error_piramide is not None:
+        return jsonify({
+            'success': False,
+            'error': error_piramide
+        }), 500
+    if piramide is None:
+        response = jsonify({
+            'success': False,
+            'error': 'La pirámide de trayectorias todavía se está construyendo'
+        })
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    try:
+        # Error admitido en metros (≈ metros por píxel del cliente) y ventana de tiempo
+        tolerancia = float(request.args.get('tolerancia', 0))
+        t0 = request.args.get('t0', type=float)
+        t1 = request.args.get('t1', type=float)
+        # Los tiempos de cada vértice solo si el cliente los pide (?tiempos=1)
+        tiempos = request.args.get('tiempos', '0') == '1'
+
+        return jsonify({'success': True, **piramide.consultar(tolerancia, t0, t1, tiempos)})
+    except Exception as e:
+        print(f"Error en trayectorias: {str(e)}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 @app.route('/orbitas_3D.csv')
 def serve_csv():
     return send_from_directory(os.path.dirname(__file__), 'orbitas_3D.csv')
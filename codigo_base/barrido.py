@@ -0,0 +1,267 @@
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from math import sqrt, pi, cos, sin
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_base.sim4sats import C, M_TIERRA, calculo_orbita_RK_3D, resolver_pseudodistancias
+
+# ──────────────────────────────────────────────────────────────
+#  BARRIDO DE PARÁMETROS REANUDABLE
+# ──────────────────────────────────────────────────────────────
+#  Cada punto de la grilla = (radio, n_sats, dt, integrador,
+#  error_oscilador, receptores). Las efemérides se propagan una sola vez
+#  por combinación (radio, n_sats, dt, integrador, pasos), se guardan en
+#  .npy y los procesos las abren con mmap en lugar de recibirlas por pickle.
+#
+#  Las pseudodistancias se generan con la órbita "verdadera" (RK4 con paso
+#  DT_REFERENCIA) y el receptor resuelve con la efeméride del escenario, así
+#  que el error mide el integrador y el dt elegidos. Además de un sesgo común
+#  del receptor (que el ajuste absorbe), cada satélite tiene su propio error
+#  de oscilador sorteado en ±error_oscilador, como en simTiempo.py.
+#
+#  Los resultados se agregan en partes Parquet (hace falta pyarrow o
+#  fastparquet); al reanudar se saltan los escenarios cuyo id ya está escrito.
+
+# Conjuntos de receptores (posiciones reales en m) que la grilla nombra
+RECEPTORES = {
+    "origen":     [(0, 0, 0)],
+    "superficie": [( 6_371_000,         0,         0),
+                   (         0, 6_371_000,         0),
+                   (         0,         0, 6_371_000)],
+}
+
+CLAVES_EFEMERIDE = ("radio", "n_sats", "dt", "integrador", "pasos")
+
+DT_REFERENCIA = 0.1        # s, paso de la órbita de referencia (todo dt debe ser múltiplo)
+SESGO_RECEPTOR = 1/32768   # s, sesgo común del reloj del receptor
+
+
+def expandir_grilla(grilla):
+    """Producto cartesiano de la grilla declarativa → lista de escenarios."""
+    claves = sorted(grilla)
+    escenarios = []
+    for valores in itertools.product(*(grilla[k] for k in claves)):
+        esc = dict(zip(claves, valores))
+        esc["id"] = _hash(esc)
+        escenarios.append(esc)
+    return escenarios
+
+
+def posiciones_iniciales(radio, n_sats):
+    """Reparte n_sats posiciones sobre la esfera de radio `radio` (espiral de Fibonacci)."""
+    aureo = pi * (3 - sqrt(5))
+    pos = []
+    for k in range(n_sats):
+        z = 1 - 2*(k + 0.5)/n_sats
+        r = sqrt(1 - z*z)
+        pos.append((radio*r*cos(aureo*k), radio*r*sin(aureo*k), radio*z))
+    return pos
+
+
+def _hash(d):
+    return hashlib.sha1(json.dumps(d, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ──────────────────────────────────────────────────────────────
+#  EFEMÉRIDES (una por combinación, compartidas por mmap)
+# ──────────────────────────────────────────────────────────────
+def ruta_efemeride(dir_efem, esc):
+    clave = {k: esc[k] for k in CLAVES_EFEMERIDE}
+    return os.path.join(dir_efem, f"efem_{_hash(clave)}.npy")
+
+
+def ruta_referencia(dir_efem, esc, duracion):
+    clave = {"radio": esc["radio"], "n_sats": esc["n_sats"], "duracion": duracion}
+    return os.path.join(dir_efem, f"ref_{_hash(clave)}.npy")
+
+
+def referencia(esc, duracion):
+    """Escenario de la órbita de referencia: RK4 con paso DT_REFERENCIA hasta `duracion`."""
+    return {"radio": esc["radio"], "n_sats": esc["n_sats"], "dt": DT_REFERENCIA,
+            "integrador": "rk4", "pasos": int(round(duracion/DT_REFERENCIA)) + 1}
+
+
+def generar_efemeride(esc, ruta):
+    """Propaga los n_sats satélites y guarda una matriz [t, x1, y1, z1, ..., zN]."""
+    if os.path.exists(ruta):
+        return ruta
+    columnas = []
+    for start in posiciones_iniciales(esc["radio"], esc["n_sats"]):
+        dfi = calculo_orbita_RK_3D(M_TIERRA, esc["radio"], start, esc["pasos"],
+                                   dt=esc["dt"], integrador=esc["integrador"])
+        if not columnas:
+            columnas.append(dfi["t"].to_numpy())
+        columnas += [dfi["x"].to_numpy(), dfi["y"].to_numpy(), dfi["z"].to_numpy()]
+    tmp = ruta + ".tmp.npy"
+    np.save(tmp, np.column_stack(columnas))
+    os.replace(tmp, ruta)                  # escritura atómica
+    return ruta
+
+
+# ──────────────────────────────────────────────────────────────
+#  EVALUACIÓN DE UN ESCENARIO (corre en un proceso del pool)
+# ──────────────────────────────────────────────────────────────
+def evaluar_escenario(esc, ruta, ruta_ref, n_instantes=10):
+    efem = np.load(ruta, mmap_mode="r")
+    ref  = np.load(ruta_ref, mmap_mode="r")
+    n = esc["n_sats"]
+    rng = np.random.default_rng(int(esc["id"], 16))   # reproducible por escenario
+
+    errores, errores_sesgo, errores_efem = [], [], []
+    for fila in np.linspace(0, len(efem) - 1, n_instantes).astype(int):
+        t = efem[fila, 0]
+        sats     = np.array(efem[fila, 1:]).reshape(n, 3)   # lo que cree el receptor
+        sats_ref = np.array(ref[int(round(t/DT_REFERENCIA)), 1:]).reshape(n, 3)
+        errores_efem.append(np.linalg.norm(sats - sats_ref, axis=1).max())
+
+        for rcv in RECEPTORES[esc["receptores"]]:
+            # ρ_i = d_i(verdadera) + c·(Δt_receptor + Δt_oscilador_i)
+            sesgo = rng.uniform(-SESGO_RECEPTOR, SESGO_RECEPTOR)
+            osc = rng.uniform(-esc["error_oscilador"], esc["error_oscilador"], n)
+            rho = np.linalg.norm(sats_ref - np.array(rcv), axis=1) + C*(sesgo + osc)
+
+            pos, sesgo_est = resolver_pseudodistancias(sats, rho)
+            errores.append(np.linalg.norm(pos - np.array(rcv)))
+            errores_sesgo.append(abs(sesgo_est - sesgo))
+
+    errores = np.array(errores)
+    return {**esc,
+            "error_medio":          float(errores.mean()),
+            "error_max":            float(errores.max()),
+            "error_sesgo_medio":    float(np.mean(errores_sesgo)),     # s
+            "error_efemeride_max":  float(np.max(errores_efem)),       # m
+            "n_soluciones":         len(errores)}
+
+
+# ──────────────────────────────────────────────────────────────
+#  RESULTADOS EN COLUMNAS (partes Parquet) Y REANUDACIÓN
+# ──────────────────────────────────────────────────────────────
+def _partes(dir_resultados):
+    """Partes escritas, como {número: ruta} (parte_NNNNN.parquet)."""
+    partes = {}
+    for f in os.listdir(dir_resultados):
+        if f.startswith("parte_") and f.endswith(".parquet") and f[6:-8].isdigit():
+            partes[int(f[6:-8])] = os.path.join(dir_resultados, f)
+    return dict(sorted(partes.items()))
+
+
+def ids_completados(dir_resultados):
+    """Ids ya escritos y número de la próxima parte (nunca pisa una existente)."""
+    partes = _partes(dir_resultados)
+    ids = set()
+    for ruta in partes.values():
+        ids.update(pd.read_parquet(ruta, columns=["id"])["id"])
+    return ids, max(partes, default=-1) + 1
+
+
+def verificar_parquet():
+    """Falla antes de calcular nada si no hay motor Parquet instalado."""
+    for motor in ("pyarrow", "fastparquet"):
+        try:
+            __import__(motor)
+            return motor
+        except ImportError:
+            pass
+    raise ImportError("El barrido guarda sus resultados en Parquet: "
+                      "instalar pyarrow (pip install pyarrow) o fastparquet")
+
+
+def escribir_parte(dir_resultados, filas, n_parte):
+    ruta = os.path.join(dir_resultados, f"parte_{n_parte:05d}.parquet")
+    tmp = ruta + ".tmp"
+    pd.DataFrame(filas).to_parquet(tmp, index=False)
+    os.replace(tmp, ruta)
+
+
+def ejecutar_barrido(grilla, dir_resultados, procesos=None, tam_lote=200):
+    """
+    Corre todos los escenarios de `grilla` que aún no estén en `dir_resultados`.
+    Cada `tam_lote` resultados se escribe una parte nueva, así que una
+    interrupción pierde como mucho un lote.
+    """
+    verificar_parquet()
+    dir_efem = os.path.join(dir_resultados, "efemerides")
+    os.makedirs(dir_efem, exist_ok=True)
+
+    escenarios = expandir_grilla(grilla)
+    for esc in escenarios:
+        if esc["n_sats"] < 4:
+            raise ValueError(f"Se necesitan al menos 4 satélites, la grilla pide {esc['n_sats']}")
+        if abs(esc["dt"]/DT_REFERENCIA - round(esc["dt"]/DT_REFERENCIA)) > 1e-9:
+            raise ValueError(f"dt = {esc['dt']} no es múltiplo de DT_REFERENCIA = {DT_REFERENCIA}")
+
+    # Una órbita de referencia por (radio, n_sats), tan larga como el escenario más largo
+    duraciones = {}
+    for esc in escenarios:
+        clave = (esc["radio"], esc["n_sats"])
+        duraciones[clave] = max(duraciones.get(clave, 0), (esc["pasos"] - 1)*esc["dt"])
+
+    def ruta_ref(esc):
+        return ruta_referencia(dir_efem, esc, duraciones[(esc["radio"], esc["n_sats"])])
+
+    hechos, n_parte = ids_completados(dir_resultados)
+    pendientes = [e for e in escenarios if e["id"] not in hechos]
+    print(f"Escenarios: {len(escenarios)}  hechos: {len(hechos)}  pendientes: {len(pendientes)}")
+    if not pendientes:
+        return
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        # ─── 1. Efemérides únicas, propagadas en paralelo ─────────────
+        rutas = {}
+        for esc in pendientes:
+            rutas.setdefault(ruta_efemeride(dir_efem, esc), esc)
+            duracion = duraciones[(esc["radio"], esc["n_sats"])]
+            rutas.setdefault(ruta_ref(esc), referencia(esc, duracion))
+        for fut in as_completed([pool.submit(generar_efemeride, esc, ruta)
+                                 for ruta, esc in rutas.items()]):
+            fut.result()
+
+        # ─── 2. Escenarios; los resultados se vuelcan por lotes ───────
+        futuros = [pool.submit(evaluar_escenario, esc,
+                               ruta_efemeride(dir_efem, esc), ruta_ref(esc))
+                   for esc in pendientes]
+        lote = []
+        try:
+            for fut in as_completed(futuros):
+                lote.append(fut.result())
+                if len(lote) >= tam_lote:
+                    escribir_parte(dir_resultados, lote, n_parte)
+                    n_parte, lote = n_parte + 1, []
+        finally:
+            if lote:
+                escribir_parte(dir_resultados, lote, n_parte)
+            for fut in futuros:
+                fut.cancel()
+
+
+def leer_resultados(dir_resultados):
+    partes = _partes(dir_resultados)
+    if not partes:
+        raise FileNotFoundError(f"Todavía no hay resultados en {dir_resultados}")
+    return pd.concat([pd.read_parquet(r) for r in partes.values()],
+                     ignore_index=True)
+
+
+# ──────────────────────────────────────────────────────────────
+#  SIMULACIÓN
+# ──────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    grilla = {
+        "radio":           [20_200_000 + 6_371_000, 26_600_000],
+        "n_sats":          [4, 6, 8],
+        "dt":              [1.0, 5.0],
+        "pasos":           [6000],
+        "integrador":      ["rk4", "euler"],
+        "error_oscilador": [1e-7, 1e-8, 1e-9],
+        "receptores":      ["origen", "superficie"],
+    }
+    ejecutar_barrido(grilla, "resultados_barrido")
+    print(leer_resultados("resultados_barrido")
+          .groupby(["integrador", "n_sats"])["error_medio"].mean())
@@ -0,0 +1,184 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from codigo_base.sim4sats import C, resolver_pseudodistancias
+
+# ──────────────────────────────────────────────────────────────
+#  GENERADOR DE PSEUDODISTANCIAS SINTÉTICAS
+# ──────────────────────────────────────────────────────────────
+#  Etapa separada de la propagación y de la resolución: toma una efeméride
+#  [t, x1, y1, z1, ..., zN] (la misma matriz que guarda barrido.py o el CSV
+#  orbitas_3D.csv) y produce, para R receptores × S satélites × E épocas,
+#
+#      ρ = |r_rcv(t) - r_sat(t - τ)| + c·(b0 + deriva·t) + ε_sat
+#
+#  con τ el tiempo de viaje de la señal (corrección de luz). Todo está
+#  vectorizado sobre receptores, satélites y épocas; la salida se escribe
+#  por bloques de épocas en .npy (binario) o .csv para reproducirla después;
+#  manifiesto.json lista los bloques de la última corrida.
+
+DTYPE_MEDICION = np.dtype([
+    ("t",               "f8"),
+    ("receptor",        "i4"),
+    ("satelite",        "i4"),
+    ("pseudodistancia", "f8"),
+    ("x_sat",           "f8"),     # posición del satélite al emitir (t - τ)
+    ("y_sat",           "f8"),
+    ("z_sat",           "f8"),
+])
+
+MANIFIESTO = "manifiesto.json"
+
+
+def separar_efemeride(efem):
+    """Matriz [t, x1, y1, z1, ...] → tiempos (E,) y posiciones (E, S, 3)."""
+    efem = np.asarray(efem)
+    return efem[:, 0], efem[:, 1:].reshape(len(efem), -1, 3)
+
+
+def generar_bloque(t, sats, vel, receptores, sesgo0, deriva, sigma, rng,
+                   iter_luz=3):
+    """
+    Pseudodistancias de un bloque de épocas.
+
+    t: (E,), sats / vel: (E, S, 3), receptores: (R, 3),
+    sesgo0 / deriva: (R,) en s y s/s, sigma: (S,) ruido por satélite en m.
+    Devuelve un arreglo estructurado DTYPE_MEDICION de largo E·R·S.
+    """
+    rcv = receptores[None, :, None, :]                    # (1, R, 1, 3)
+    s   = sats[:, None, :, :]                             # (E, 1, S, 3)
+    v   = vel[:, None, :, :]
+
+    # ─── Corrección de luz: r_sat(t - τ) ≈ r_sat(t) - τ·v_sat(t) ──────
+    tau = np.linalg.norm(rcv - s, axis=-1) / C            # (E, R, S)
+    for _ in range(iter_luz - 1):
+        tau = np.linalg.norm(rcv - (s - tau[..., None]*v), axis=-1) / C
+    emision = s - tau[..., None]*v                        # (E, R, S, 3)
+    dist = np.linalg.norm(rcv - emision, axis=-1)
+
+    # ─── Reloj del receptor (sesgo + deriva) y ruido por satélite ─────
+    reloj = sesgo0[None, :] + deriva[None, :]*t[:, None]  # (E, R) en s
+    rho = dist + C*reloj[:, :, None] + rng.normal(size=dist.shape)*sigma
+
+    E, R, S = dist.shape
+    bloque = np.empty(E*R*S, dtype=DTYPE_MEDICION)
+    bloque["t"]               = np.repeat(t, R*S)
+    bloque["receptor"]        = np.tile(np.repeat(np.arange(R), S), E)
+    bloque["satelite"]        = np.tile(np.arange(1, S + 1), E*R)
+    bloque["pseudodistancia"] = rho.ravel()
+    bloque["x_sat"], bloque["y_sat"], bloque["z_sat"] = emision.reshape(-1, 3).T
+    return bloque
+
+
+def generar_mediciones(efem, receptores, dir_salida, formato="npy",
+                       error_oscilador=1/32768, deriva_max=1e-9,
+                       sigma=3.0, epocas_por_bloque=1000, semilla=None):
+    """
+    Escribe el flujo de pseudodistancias en `dir_salida`, un archivo por
+    bloque de épocas (medidas_00000.npy / .csv, ...), y al final el
+    manifiesto. Los bloques y el manifiesto de una corrida anterior se borran.
+
+    error_oscilador: el sesgo inicial de cada receptor se sortea en ±ese valor (s).
+    deriva_max:      la deriva de cada reloj se sortea en ±ese valor (s/s).
+    sigma:           ruido en m, un escalar o uno por satélite.
+    Devuelve la cantidad de mediciones escritas.
+    """
+    if formato not in ("npy", "csv"):
+        raise ValueError(f"Formato desconocido: {formato}")
+    os.makedirs(dir_salida, exist_ok=True)
+    for f in os.listdir(dir_salida):
+        if f == MANIFIESTO or f.startswith("medidas_"):
+            os.remove(os.path.join(dir_salida, f))
+
+    t, sats = separar_efemeride(efem)
+    vel = np.gradient(sats, t, axis=0)                    # velocidad de cada satélite
+    receptores = np.asarray(receptores, dtype=float).reshape(-1, 3)
+    R, S = len(receptores), sats.shape[1]
+
+    rng    = np.random.default_rng(semilla)
+    sesgo0 = rng.uniform(-error_oscilador, error_oscilador, R)
+    deriva = rng.uniform(-deriva_max, deriva_max, R)
+    sigma  = np.broadcast_to(np.asarray(sigma, dtype=float), (S,))
+
+    total, bloques = 0, []
+    for n_bloque, i in enumerate(range(0, len(t), epocas_por_bloque)):
+        j = i + epocas_por_bloque
+        bloque = generar_bloque(t[i:j], sats[i:j], vel[i:j], receptores,
+                                sesgo0, deriva, sigma, rng)
+        nombre = f"medidas_{n_bloque:05d}.{formato}"
+        ruta = os.path.join(dir_salida, nombre)
+        if formato == "npy":
+            np.save(ruta, bloque)
+        else:
+            pd.DataFrame(bloque).to_csv(ruta, index=False)
+        bloques.append(nombre)
+        total += len(bloque)
+
+    # El manifiesto va último: sin él la corrida quedó incompleta
+    with open(os.path.join(dir_salida, MANIFIESTO), "w") as f:
+        json.dump({"formato": formato, "n_bloques": len(bloques),
+                   "bloques": bloques, "mediciones": total}, f, indent=2)
+    return total
+
+
+# ──────────────────────────────────────────────────────────────
+#  REPRODUCCIÓN
+# ──────────────────────────────────────────────────────────────
+def leer_mediciones(dir_salida):
+    """Recorre en orden los bloques que lista el manifiesto; cada uno es un DataFrame."""
+    ruta_manifiesto = os.path.join(dir_salida, MANIFIESTO)
+    if not os.path.exists(ruta_manifiesto):
+        raise FileNotFoundError(f"No hay {MANIFIESTO} en {dir_salida} (corrida incompleta o inexistente)")
+    with open(ruta_manifiesto) as f:
+        manifiesto = json.load(f)
+
+    for nombre in manifiesto["bloques"]:
+        ruta = os.path.join(dir_salida, nombre)
+        if manifiesto["formato"] == "npy":
+            yield pd.DataFrame(np.load(ruta))
+        else:
+            yield pd.read_csv(ruta)
+
+
+def resolver_mediciones(dir_salida):
+    """Resuelve posición y sesgo para cada (t, receptor) del flujo grabado."""
+    filas = []
+    for bloque in leer_mediciones(dir_salida):
+        for (t, receptor), g in bloque.groupby(["t", "receptor"], sort=False):
+            sats = g[["x_sat", "y_sat", "z_sat"]].to_numpy()
+            pos, sesgo = resolver_pseudodistancias(sats, g["pseudodistancia"].to_numpy())
+            filas.append({'t': t, 'receptor': receptor,
+                          'x': pos[0], 'y': pos[1], 'z': pos[2], 'sesgo': sesgo})
+    return pd.DataFrame(filas)
+
+
+# ──────────────────────────────────────────────────────────────
+#  SIMULACIÓN
+# ──────────────────────────────────────────────────────────────
+if __name__ == "__main__":
+    import time
+
+    # Efeméride de ejemplo: el CSV del visor (3 satélites) no alcanza para
+    # resolver con 4 incógnitas, así que se agrega el satélite 2 rotado 45° en z
+    # (arranca en el mismo punto que s4 de sim4sats).
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), "..", "Render",
+                                  "trayectoria_3D", "orbitas_3D.csv"))
+    t, sats = separar_efemeride(df.to_numpy())
+    c45 = np.sqrt(0.5)
+    giro = np.array([[c45, -c45, 0], [c45, c45, 0], [0, 0, 1]])
+    sats = np.concatenate([sats, sats[:, 1:2] @ giro.T], axis=1)
+    efem = np.column_stack([t, sats.reshape(len(t), -1)])
+
+    receptores = [(0, 0, 0), (6_371_000, 0, 0), (0, 6_371_000, 0)]
+    inicio = time.perf_counter()
+    n = generar_mediciones(efem, receptores, "medidas", semilla=0)
+    seg = time.perf_counter() - inicio
+    print(f"{n} mediciones en {seg:.2f} s ({n/seg:,.0f} obs/s)")
+
+    sol = resolver_mediciones("medidas")
+    print(sol.head())
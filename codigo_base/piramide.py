@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+# ──────────────────────────────────────────────────────────────
+#  PIRÁMIDE DE NIVELES DE DETALLE PARA TRAYECTORIAS 3D
+# ──────────────────────────────────────────────────────────────
+#  Se corre Ramer-Douglas-Peucker una sola vez por satélite guardando la
+#  "importancia" de cada punto (distancia a la cuerda con la que fue elegido,
+#  acotada por la de su padre). Así el nivel de tolerancia ε son simplemente
+#  los puntos con importancia > ε, y cada nivel está contenido en el siguiente
+#  y tiene error máximo ≤ ε respecto de la trayectoria completa.
+
+# Tolerancias de cada nivel en metros (de grueso a fino)
+TOLERANCIAS = (200_000, 50_000, 12_500, 3_000, 750, 200, 50)
+
+
+def importancia_rdp(puntos, tol_min=TOLERANCIAS[-1]):
+    """
+    Importancia RDP de cada punto de una polilínea (n, 3).
+    Los extremos valen inf; los puntos que no hace falta partir por debajo de
+    `tol_min` quedan en 0.
+    """
+    n = len(puntos)
+    imp = np.zeros(n)
+    imp[0] = imp[-1] = np.inf
+    pila = [(0, n - 1, np.inf)]
+    while pila:
+        i, j, techo = pila.pop()
+        if j - i < 2:
+            continue
+        a, b = puntos[i], puntos[j]
+        seg = b - a
+        largo = np.linalg.norm(seg)
+        rel = puntos[i+1:j] - a
+        if largo > 0:
+            d = np.linalg.norm(np.cross(rel, seg / largo), axis=1)
+        else:
+            d = np.linalg.norm(rel, axis=1)
+        k = int(np.argmax(d))
+        dmax = min(d[k], techo)
+        if dmax <= tol_min:
+            continue
+        k += i + 1
+        imp[k] = dmax
+        pila.append((i, k, dmax))
+        pila.append((k, j, dmax))
+    return imp
+
+
+class PiramideTrayectorias:
+    """Precalcula la importancia de cada satélite y sirve el nivel pedido."""
+
+    def __init__(self, df, tolerancias=TOLERANCIAS):
+        self.t = df["t"].to_numpy()
+        self.tolerancias = tuple(sorted(tolerancias, reverse=True))
+        n_sats = sum(1 for c in df.columns if c[0] == "x" and c[1:].isdigit())
+        self.satelites = {}
+        for i in range(1, n_sats + 1):
+            pts = df[[f"x{i}", f"y{i}", f"z{i}"]].to_numpy(dtype=float)
+            imp = importancia_rdp(pts, self.tolerancias[-1])
+            # índices de cada nivel, ya ordenados por tiempo
+            niveles = [np.flatnonzero(imp > tol) for tol in self.tolerancias]
+            self.satelites[f"sat{i}"] = (pts, niveles)
+
+    def elegir_nivel(self, tolerancia):
+        """Nivel más grueso cuyo error no supera `tolerancia` (m)."""
+        for nivel, tol in enumerate(self.tolerancias):
+            if tol <= tolerancia:
+                return nivel
+        return len(self.tolerancias) - 1
+
+    def consultar(self, tolerancia, t0=None, t1=None, tiempos=False):
+        """
+        Devuelve el nivel elegido y, por satélite, los puntos (x, y, z) del
+        nivel dentro de [t0, t1] más un punto a cada lado para que la línea
+        cubra la ventana completa. Con `tiempos` agrega el t de cada punto.
+        """
+        nivel = self.elegir_nivel(tolerancia)
+        t0 = self.t[0] if t0 is None else t0
+        t1 = self.t[-1] if t1 is None else t1
+        salida = {}
+        for nombre, (pts, niveles) in self.satelites.items():
+            idx = niveles[nivel]
+            ti = self.t[idx]
+            desde = max(np.searchsorted(ti, t0, side="left") - 1, 0)
+            hasta = min(np.searchsorted(ti, t1, side="right") + 1, len(idx))
+            idx = idx[desde:hasta]
+            salida[nombre] = {'puntos': pts[idx].ravel().tolist()}   # [x0, y0, z0, x1, ...]
+            if tiempos:
+                salida[nombre]['t'] = self.t[idx].tolist()
+        return {
+            'nivel': nivel,
+            'tolerancia': self.tolerancias[nivel],
+            'satelites': salida,
+        }
+
+
+def cargar_piramide(ruta_csv, tolerancias=TOLERANCIAS):
+    return PiramideTrayectorias(pd.read_csv(ruta_csv), tolerancias)
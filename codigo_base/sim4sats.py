@@ -11,8 +11,12 @@ C          = 299_792_458        # m/s  (velocidad de la luz)
 # ──────────────────────────────────────────────────────────────
 #  ÓRBITA KEPLERIANA SIMPLE CON RK-4
 # ──────────────────────────────────────────────────────────────
-def calculo_orbita_RK_3D(m1, radio, start_pos, pasos=10000, dt=1.0):
-    """Devuelve un DataFrame con columnas t, x, y, z para un satélite."""
+def calculo_orbita_RK_3D(m1, radio, start_pos, pasos=10000, dt=1.0,
+                         integrador="rk4"):
+    """
+    Devuelve un DataFrame con columnas t, x, y, z para un satélite.
+    `integrador` elige el paso: "rk4" (por defecto) o "euler" (simpléctico).
+    """
     x0, y0, z0 = start_pos
     r0 = sqrt(x0**2 + y0**2 + z0**2)
     v0 = sqrt(G * m1 / r0)                 # velocidad circular
@@ -38,28 +42,45 @@ def calculo_orbita_RK_3D(m1, radio, start_pos, pasos=10000, dt=1.0):
         k4 = F(state + h*k3)
         return state + h*(k1 + 2*k2 + 2*k3 + k4)/6
 
+    def euler_step(state, h):
+        # Euler simpléctico: primero la velocidad, luego la posición
+        a = F(state)
+        nuevo = state.copy()
+        nuevo[1::2] += h*a[1::2]
+        nuevo[0::2] += h*nuevo[1::2]
+        return nuevo
+
+    pasos_int = {"rk4": rk4_step, "euler": euler_step}
+    if integrador not in pasos_int:
+        raise ValueError(f"Integrador desconocido: {integrador}")
+    paso = pasos_int[integrador]
+
     registros, t = [], 0.0
     for _ in range(pasos):
         registros.append({'t':t, 'x':y[0], 'y':y[2], 'z':y[4]})
-        y = rk4_step(y, dt)
+        y = paso(y, dt)
         t += dt
     return pd.DataFrame(registros)
 
 # ──────────────────────────────────────────────────────────────
-#  ESTIMACIÓN GPS CON 4 SATÉLITES (x, y, z, sesgo de reloj)
+#  ESTIMACIÓN GPS CON ≥4 SATÉLITES (x, y, z, sesgo de reloj)
 # ──────────────────────────────────────────────────────────────
 def posicion_4sats_con_error(df, t, x_real, y_real, z_real,
                              error_oscilador=1/32768):
     """
-    Devuelve posición estimada y sesgo Δt (en segundos) usando 4 satélites.
+    Devuelve posición estimada y sesgo Δt (en segundos) usando todos los
+    satélites del DataFrame (columnas x1..xN, al menos 4).
     El receptor REAL está en (x_real, y_real, z_real)—solo para simular.
     """
-    # ─── 1. Posiciones de los 4 satélites en el instante t ─────────────
+    # ─── 1. Posiciones de los satélites en el instante t ───────────────
     fila = df[df["t"] == t]
     if fila.empty:
         raise ValueError(f"No hay datos para t = {t}")
+    n_sats = sum(1 for col in df.columns if col[0] == "x" and col[1:].isdigit())
+    if n_sats < 4:
+        raise ValueError(f"Se necesitan al menos 4 satélites, hay {n_sats}")
     sats = [np.array(fila[[f"{c}{i}" for c in "xyz"]].iloc[0])
-            for i in (1,2,3,4)]                                    # p1..p4
+            for i in range(1, n_sats + 1)]                         # p1..pN
 
     # ─── 2. Pseudodistancias (ρ) con error realista ───────────────────
     rcv        = np.array([x_real, y_real, z_real])
@@ -69,7 +90,17 @@ def posicion_4sats_con_error(df, t, x_real, y_real, z_real,
         d_true = np.linalg.norm(rcv - p)                 # distancia real
         pseudorange.append(d_true + bias)        # ρ_i = d_i + cΔt + ε
 
-    # ─── 3. Resolución por mínimos cuadrados iterativos ───────────────
+    return resolver_pseudodistancias(sats, pseudorange)   # posición, Δt (s)
+
+# ──────────────────────────────────────────────────────────────
+#  MÍNIMOS CUADRADOS ITERATIVOS (x, y, z, sesgo de reloj)
+# ──────────────────────────────────────────────────────────────
+def resolver_pseudodistancias(sats, pseudorange):
+    """
+    Posición y sesgo Δt (s) a partir de posiciones de satélites y
+    pseudodistancias medidas (m). Sirve tanto para las mediciones simuladas
+    arriba como para las que se reproducen desde `mediciones.py`.
+    """
     #     Desconocidos: (x, y, z, b) con b en metros (b = cΔt)
     x, y, z, b = 0., 0., 0., 0.                          # semilla
     for _ in range(10):                                  # ~10 iteraciones bastan
@@ -78,7 +109,7 @@ def posicion_4sats_con_error(df, t, x_real, y_real, z_real,
             dx, dy, dz = x - p[0], y - p[1], z - p[2]
             r_hat = sqrt(dx*dx + dy*dy + dz*dz)
             res.append(ρ - (r_hat + b))                  # ρ - (r + b)
-            H.append([-dx/r_hat, -dy/r_hat, -dz/r_hat, -1.0])
+            H.append([dx/r_hat, dy/r_hat, dz/r_hat, 1.0])  # ∂(r + b)/∂(x, y, z, b)
         H, res = np.array(H), np.array(res)
         delta   = np.linalg.lstsq(H, res, rcond=None)[0]
         x, y, z, b = x+delta[0], y+delta[1], z+delta[2], b+delta[3]
@@ -89,29 +120,30 @@ def posicion_4sats_con_error(df, t, x_real, y_real, z_real,
 # ──────────────────────────────────────────────────────────────
 #  SIMULACIÓN
 # ──────────────────────────────────────────────────────────────
-radio = 26_600_000        # ~órbita MEO (m)
-
-# satélites en 4 fases distintas
-s1 = ( radio,      0,      0)
-s2 = (     0, radio,      0)
-s3 = (     0,      0, radio)
-s4 = (-radio/sqrt(2),  radio/sqrt(2), 0)   # cuarto satélite
-
-pasos = 6000               # ≈ una hora con dt=1 s
-df1 = calculo_orbita_RK_3D(M_TIERRA, radio, s1, pasos)
-df2 = calculo_orbita_RK_3D(M_TIERRA, radio, s2, pasos)
-df3 = calculo_orbita_RK_3D(M_TIERRA, radio, s3, pasos)
-df4 = calculo_orbita_RK_3D(M_TIERRA, radio, s4, pasos)
-
-# juntar los 4 satélites por la columna 't'
-df = df1.merge(df2, on="t", suffixes=("1", "2"))
-df = df.merge(df3, on="t")
-df.rename(columns={"x":"x3", "y":"y3", "z":"z3"}, inplace=True)
-df = df.merge(df4, on="t", suffixes=("", "4"))
-df.rename(columns={"x":"x4", "y":"y4", "z":"z4"}, inplace=True)
-
-# ─── Ejemplo de posicionamiento en t = 500 s ──────────────────────────
-pos, dt_bias = posicion_4sats_con_error(df, t=500, x_real=0, y_real=0, z_real=0)
-print("Posición estimada (m):", pos)
-print("Sesgo de reloj Δt (s):", dt_bias)
-print("Error (m):", np.linalg.norm(pos))
+if __name__ == "__main__":
+    radio = 26_600_000        # ~órbita MEO (m)
+
+    # satélites en 4 fases distintas
+    s1 = ( radio,      0,      0)
+    s2 = (     0, radio,      0)
+    s3 = (     0,      0, radio)
+    s4 = (-radio/sqrt(2),  radio/sqrt(2), 0)   # cuarto satélite
+
+    pasos = 6000               # ≈ una hora con dt=1 s
+    df1 = calculo_orbita_RK_3D(M_TIERRA, radio, s1, pasos)
+    df2 = calculo_orbita_RK_3D(M_TIERRA, radio, s2, pasos)
+    df3 = calculo_orbita_RK_3D(M_TIERRA, radio, s3, pasos)
+    df4 = calculo_orbita_RK_3D(M_TIERRA, radio, s4, pasos)
+
+    # juntar los 4 satélites por la columna 't'
+    df = df1.merge(df2, on="t", suffixes=("1", "2"))
+    df = df.merge(df3, on="t")
+    df.rename(columns={"x":"x3", "y":"y3", "z":"z3"}, inplace=True)
+    df = df.merge(df4, on="t", suffixes=("", "4"))
+    df.rename(columns={"x":"x4", "y":"y4", "z":"z4"}, inplace=True)
+
+    # ─── Ejemplo de posicionamiento en t = 500 s ──────────────────────────
+    pos, dt_bias = posicion_4sats_con_error(df, t=500, x_real=0, y_real=0, z_real=0)
+    print("Posición estimada (m):", pos)
+    print("Sesgo de reloj Δt (s):", dt_bias)
+    print("Error (m):", np.linalg.norm(pos))